@@ -2,19 +2,87 @@
 from __future__ import annotations
 
 import json
+import math
+import os
 from pathlib import Path
 from typing import Iterable
 
+try:
+    import orjson  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    orjson = None
+
 from .models import Alert
 
+# ``json.dumps(..., indent=2)`` builds a new encoder on every call; alert files
+# share one instead.
+_encode_str = json.JSONEncoder(indent=2).encode
+
+
+def _encode(payload: dict) -> bytes:
+    if orjson is not None and not _has_non_finite(payload):
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+        except (orjson.JSONEncodeError, TypeError):
+            # orjson rejects values ``json`` accepts, such as integers beyond
+            # 64 bits or non-string mapping keys.
+            pass
+    return _encode_str(payload).encode("ascii")
+
+
+def _has_non_finite(value) -> bool:
+    # orjson writes NaN and infinities as ``null``; ``json`` keeps them.
+    kind = type(value)
+    if kind is float:
+        return not math.isfinite(value)
+    if kind is dict:
+        return any(_has_non_finite(item) for item in value.values())
+    if kind is list:
+        return any(_has_non_finite(item) for item in value)
+    return False
+
 
 class AlertDispatcher:
     """Dispatch alerts to stdout and optionally to disk."""
 
     def __init__(self, output_dir: Path | None = None):
         self.output_dir = output_dir
+        self._dir_fd: int | None = None
         if self.output_dir:
             self.output_dir.mkdir(parents=True, exist_ok=True)
+            # Alert files are created relative to an open directory descriptor
+            # so the directory path is not resolved again for every alert.
+            # ``O_PATH`` (Linux) needs no read permission on the directory, so
+            # write-only drop directories work as they do with plain paths;
+            # elsewhere, or if opening is refused, writes fall back to paths.
+            if os.open in os.supports_dir_fd and hasattr(os, "O_DIRECTORY"):
+                flags = getattr(os, "O_PATH", os.O_RDONLY) | os.O_DIRECTORY | getattr(os, "O_CLOEXEC", 0)
+                try:
+                    self._dir_fd = os.open(self.output_dir, flags)
+                except PermissionError:
+                    self._dir_fd = None
+
+    def close(self) -> None:
+        """Release the alert directory descriptor.
+
+        Called by ``with`` blocks and, as a fallback, when the dispatcher is
+        garbage collected.
+        """
+
+        if self._dir_fd is not None:
+            os.close(self._dir_fd)
+            self._dir_fd = None
+
+    def __del__(self) -> None:
+        # ``_dir_fd`` may be missing if ``__init__`` raised before setting it.
+        if getattr(self, "_dir_fd", None) is not None:
+            self.close()
+
+    def __enter__(self) -> "AlertDispatcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def dispatch(self, alerts: Iterable[Alert]) -> None:
         for alert in alerts:
@@ -56,4 +124,14 @@ class AlertDispatcher:
                 for event in alert.events
             ],
         }
-        (self.output_dir / filename).write_text(json.dumps(payload, indent=2))
+        data = _encode(payload)
+        if self._dir_fd is None:
+            (self.output_dir / filename).write_bytes(data)
+            return
+        fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666, dir_fd=self._dir_fd)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
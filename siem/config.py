@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List
 
@@ -9,6 +10,11 @@ try:
     import yaml  # type: ignore
 except ModuleNotFoundError:  # pragma: no cover - optional dependency
     yaml = None
+    _YamlLoader = None
+else:
+    # Prefer the LibYAML C bindings; PyYAML falls back to its pure-Python
+    # loader when it was built without libyaml.
+    _YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 from .models import DetectionRule
 
@@ -31,7 +37,8 @@ def load_rules(paths: Iterable[Path]) -> List[DetectionRule]:
     for path in paths:
         if not path.exists():
             raise ConfigurationError(f"Rule file {path} does not exist")
-        data = _parse_file(path)
+        stat = path.stat()
+        data = _parse_file_cached(path, stat.st_mtime_ns, stat.st_size)
         if not isinstance(data, list):
             raise ConfigurationError(f"Rule file {path} must contain a list")
         for item in data:
@@ -39,18 +46,72 @@ def load_rules(paths: Iterable[Path]) -> List[DetectionRule]:
     return rules
 
 
-def _parse_file(path: Path):
+@lru_cache(maxsize=64)
+def _parse_file_cached(path: Path, mtime_ns: int, size: int):
+    # ``mtime_ns`` and ``size`` are part of the cache key so that edited rule
+    # files are re-read by long-running processes.
+    return _parse_file(path, mtime_ns, size)
+
+
+def _parse_file(path: Path, mtime_ns: int, size: int):
     if path.suffix.lower() in {".yaml", ".yml"}:
+        cached = _read_yaml_cache(path, mtime_ns, size)
+        if cached is not None:
+            return cached
         if yaml is None:
             raise ConfigurationError(
                 "PyYAML is not installed. Install it or use JSON rule files instead."
             )
-        return yaml.safe_load(path.read_text())
+        data = yaml.load(path.read_text(), Loader=_YamlLoader)
+        _write_yaml_cache(path, data, mtime_ns, size)
+        return data
     if path.suffix.lower() == ".json":
         return json.loads(path.read_text())
     raise ConfigurationError(f"Unsupported rule file format: {path.suffix}")
 
 
+def _yaml_cache_path(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".cache.json")
+
+
+def _read_yaml_cache(path: Path, mtime_ns: int, size: int):
+    """Return the rules stored in the JSON sidecar of a YAML rule file.
+
+    The sidecar records the ``st_mtime_ns`` and ``st_size`` of the YAML file
+    it was built from and is only used when both match exactly, so restoring
+    an older copy of the YAML file (``cp -p``, ``tar x``) invalidates it too.
+    """
+
+    try:
+        cached = json.loads(_yaml_cache_path(path).read_text())
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(cached, dict)
+        or cached.get("mtime_ns") != mtime_ns
+        or cached.get("size") != size
+        or "rules" not in cached
+    ):
+        return None
+    return cached["rules"]
+
+
+def _write_yaml_cache(path: Path, data, mtime_ns: int, size: int) -> None:
+    try:
+        encoded = json.dumps(data)
+        # JSON cannot represent every YAML value faithfully (non-string keys
+        # become strings, for instance); only cache data that round-trips.
+        if json.loads(encoded) != data:
+            return
+        _yaml_cache_path(path).write_text(
+            json.dumps({"mtime_ns": mtime_ns, "size": size, "rules": data})
+        )
+    except (OSError, TypeError, ValueError):
+        # The sidecar is an optimisation only; read-only rule directories or
+        # YAML values without a JSON representation simply skip it.
+        pass
+
+
 def _parse_rule(data: dict, path: Path) -> DetectionRule:
     required_fields = {"id", "name", "rule_type", "description", "severity", "enabled", "parameters"}
     missing = required_fields - data.keys()
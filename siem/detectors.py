@@ -1,11 +1,20 @@
 """Detection engine for the SIEM platform."""
 from __future__ import annotations
 
-from collections import defaultdict, deque
-from datetime import datetime, timedelta
-from typing import Deque, Dict, Iterable, Iterator
+import math
+from collections import Counter, defaultdict
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, DefaultDict, Dict, FrozenSet, Hashable, Iterable, Iterator, List, Tuple
 
+from .config import ConfigurationError
 from .models import Alert, DetectionRule, Event
+from .windows import DistinctSlidingWindow, SlidingWindow
+
+Handler = Callable[[Any, Event], Iterator[Alert]]
+CompiledRule = Tuple[Hashable, FrozenSet[str], Handler, Any]
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
 
 
 class DetectionEngine:
@@ -13,134 +22,201 @@ class DetectionEngine:
 
     def __init__(self, rules: Iterable[DetectionRule]):
         self.rules = [rule for rule in rules if rule.enabled]
-        self.state: Dict[str, Dict[str, Deque[Event]]] = defaultdict(lambda: defaultdict(deque))
+        compiled = [
+            (rule, _HANDLERS[rule.rule_type](rule))
+            for rule in self.rules
+            if rule.rule_type in _HANDLERS
+        ]
+        #: Per-rule detection state, keyed by rule id, as created by each
+        #: rule's compiler.
+        self.state: Dict[str, Any] = {rule.id: state for rule, (_, _, _, state) in compiled}
+        #: Event detail keys read by the loaded rules; ingestion can use this to
+        #: skip copying fields no rule looks at.
+        self.required_fields: FrozenSet[str] = frozenset().union(
+            *(fields for _, (_, fields, _, _) in compiled)
+        )
+        # Index handlers by the event category they accept so each event only
+        # visits relevant rules. Lists keep rule order, so alerts are emitted
+        # in the same order as a full scan over all rules would produce.
+        self._by_category: Dict[Hashable, List[Tuple[Handler, Any]]] = {}
+        for _, (category, _, handler, state) in compiled:
+            self._by_category.setdefault(category, []).append((handler, state))
 
     def process(self, events: Iterable[Event]) -> Iterator[Alert]:
+        by_category = self._by_category
         for event in events:
-            for rule in self.rules:
-                handler = _HANDLERS.get(rule.rule_type)
-                if not handler:
-                    continue
-                yield from handler(self.state[rule.id], rule, event)
+            try:
+                handlers = by_category.get(event.category, ())
+            except TypeError:
+                # Unhashable categories (e.g. a JSON list) cannot equal any
+                # rule's category, which is validated to be hashable.
+                continue
+            for handler, state in handlers:
+                yield from handler(state, event)
 
 
 # --- Detection handlers ---------------------------------------------------
+#
+# Each ``_compile_*`` function reads a rule's parameters once and returns the
+# event category the rule applies to, the event detail keys it reads, and a
+# handler closure, plus the rule's initial state. The engine only calls the
+# handler with ``(state, event)`` for events whose category equals the rule's.
 
 
-def _handle_failed_login(state: Dict[str, Deque[Event]], rule: DetectionRule, event: Event) -> Iterator[Alert]:
+def _compile_failed_login(rule: DetectionRule) -> CompiledRule:
     params = rule.parameters
-    category = params.get("event_category", "auth")
+    category = _rule_category(rule, "auth")
     match_field = params.get("match_field", "result")
     match_value = params.get("match_value", "failed")
     group_by = params.get("group_by", "username")
     threshold = int(params.get("threshold", 5))
     window_minutes = int(params.get("window_minutes", 10))
-
-    if event.category != category:
-        return
-    if event.details.get(match_field) != match_value:
-        return
-
-    key = event.details.get(group_by, "unknown")
-    bucket = state[key]
-    bucket.append(event)
-    _evict_old(bucket, event.timestamp, window_minutes)
-
-    if len(bucket) >= threshold:
-        yield Alert(
-            id=f"{rule.id}:{key}:{int(event.timestamp.timestamp())}",
-            created_at=datetime.utcnow(),
-            title=f"{rule.name} for {key}",
-            description=(
-                f"Detected {len(bucket)} failed logins for {key} within {window_minutes} minutes."
-            ),
-            priority=rule.severity,
-            events=list(bucket),
-            remediation=rule.remediation,
-        )
-        bucket.clear()
-
-
-def _handle_port_scan(state: Dict[str, Deque[Event]], rule: DetectionRule, event: Event) -> Iterator[Alert]:
+    window_ns = window_minutes * _NS_PER_MINUTE
+    rule_id, rule_name, severity, remediation = rule.id, rule.name, rule.severity, rule.remediation
+
+    def handle(state: Dict[str, SlidingWindow], event: Event) -> Iterator[Alert]:
+        details = event.details
+        if details.get(match_field) != match_value:
+            return
+
+        key = details.get(group_by, "unknown")
+        bucket = state[key]
+        bucket.insert(event)
+        bucket.evict_until(event.epoch_ns - window_ns)
+
+        count = bucket.query()
+        if count >= threshold:
+            yield Alert(
+                id=f"{rule_id}:{key}:{event.epoch}",
+                created_at=datetime.utcnow(),
+                title=f"{rule_name} for {key}",
+                description=(
+                    f"Detected {count} failed logins for {key} within {window_minutes} minutes."
+                ),
+                priority=severity,
+                events=list(bucket.events),
+                remediation=remediation,
+            )
+            bucket.clear()
+
+    state: DefaultDict[str, SlidingWindow] = defaultdict(SlidingWindow)
+    return category, frozenset({match_field, group_by}), handle, state
+
+
+def _compile_port_scan(rule: DetectionRule) -> CompiledRule:
     params = rule.parameters
-    category = params.get("event_category", "network")
+    category = _rule_category(rule, "network")
     group_by = params.get("group_by", "src_ip")
     distinct_field = params.get("distinct_field", "dest_port")
     threshold = int(params.get("threshold", 15))
-    window_minutes = int(params.get("window_minutes", 5))
-
-    if event.category != category:
-        return
-
-    key = event.details.get(group_by, "unknown")
-    bucket = state[key]
-    bucket.append(event)
-    _evict_old(bucket, event.timestamp, window_minutes)
-
-    unique_values = {e.details.get(distinct_field) for e in bucket}
-    if len(unique_values) >= threshold:
-        yield Alert(
-            id=f"{rule.id}:{key}:{int(event.timestamp.timestamp())}",
-            created_at=datetime.utcnow(),
-            title=f"{rule.name} from {key}",
-            description=(
-                f"Observed potential port scan with {len(unique_values)} unique {distinct_field} values."
-            ),
-            priority=rule.severity,
-            events=list(bucket),
-            remediation=rule.remediation,
-        )
-        bucket.clear()
-
-
-def _handle_dns_anomaly(state: Dict[str, Deque[Event]], rule: DetectionRule, event: Event) -> Iterator[Alert]:
+    window_ns = int(params.get("window_minutes", 5)) * _NS_PER_MINUTE
+    rule_id, rule_name, severity, remediation = rule.id, rule.name, rule.severity, rule.remediation
+
+    def handle(state: Dict[str, DistinctSlidingWindow], event: Event) -> Iterator[Alert]:
+        key = event.details.get(group_by, "unknown")
+        bucket = state[key]
+        bucket.insert(event)
+        bucket.evict_until(event.epoch_ns - window_ns)
+
+        distinct = bucket.query()
+        if distinct >= threshold:
+            yield Alert(
+                id=f"{rule_id}:{key}:{event.epoch}",
+                created_at=datetime.utcnow(),
+                title=f"{rule_name} from {key}",
+                description=(
+                    f"Observed potential port scan with {distinct} unique {distinct_field} values."
+                ),
+                priority=severity,
+                events=list(bucket.events),
+                remediation=remediation,
+            )
+            bucket.clear()
+
+    state: DefaultDict[str, DistinctSlidingWindow] = defaultdict(
+        lambda: DistinctSlidingWindow(distinct_field)
+    )
+    return category, frozenset({group_by, distinct_field}), handle, state
+
+
+def _compile_dns_anomaly(rule: DetectionRule) -> CompiledRule:
     params = rule.parameters
-    category = params.get("event_category", "dns")
+    category = _rule_category(rule, "dns")
     length_threshold = int(params.get("length_threshold", 45))
     entropy_threshold = float(params.get("entropy_threshold", 3.5))
-
-    if event.category != category:
-        return
-
-    domain = event.details.get("query")
-    if not domain:
-        return
-
-    if len(domain) >= length_threshold or _shannon_entropy(domain) >= entropy_threshold:
-        yield Alert(
-            id=f"{rule.id}:{domain}:{int(event.timestamp.timestamp())}",
-            created_at=datetime.utcnow(),
-            title=f"{rule.name} - suspicious domain {domain}",
-            description=(
-                "Detected DNS query that may indicate tunneling activity due to long or high entropy domain name."
-            ),
-            priority=rule.severity,
-            events=[event],
-            remediation=rule.remediation,
-        )
-
-
-_HANDLERS = {
-    "failed_login_threshold": _handle_failed_login,
-    "port_scan": _handle_port_scan,
-    "dns_anomaly": _handle_dns_anomaly,
+    rule_id, rule_name, severity, remediation = rule.id, rule.name, rule.severity, rule.remediation
+
+    def handle(state: None, event: Event) -> Iterator[Alert]:
+        domain = event.details.get("query")
+        if not domain:
+            return
+
+        if len(domain) >= length_threshold or _entropy_at_least(domain, entropy_threshold):
+            yield Alert(
+                id=f"{rule_id}:{domain}:{event.epoch}",
+                created_at=datetime.utcnow(),
+                title=f"{rule_name} - suspicious domain {domain}",
+                description=(
+                    "Detected DNS query that may indicate tunneling activity due to long or high entropy domain name."
+                ),
+                priority=severity,
+                events=[event],
+                remediation=remediation,
+            )
+
+    # Each DNS query is judged on its own, so the rule keeps no state.
+    return category, frozenset({"query"}), handle, None
+
+
+def _rule_category(rule: DetectionRule, default: str) -> Hashable:
+    category = rule.parameters.get("event_category", default)
+    try:
+        hash(category)
+    except TypeError:
+        raise ConfigurationError(
+            f"Rule {rule.id} has an invalid event_category: {category!r}"
+        ) from None
+    return category
+
+
+_HANDLERS: Dict[str, Callable[[DetectionRule], CompiledRule]] = {
+    "failed_login_threshold": _compile_failed_login,
+    "port_scan": _compile_port_scan,
+    "dns_anomaly": _compile_dns_anomaly,
 }
 
 
-def _evict_old(bucket: Deque[Event], current_ts: datetime, window_minutes: int) -> None:
-    cutoff = current_ts - timedelta(minutes=window_minutes)
-    while bucket and bucket[0].timestamp < cutoff:
-        bucket.popleft()
-
-
-def _shannon_entropy(value: str) -> float:
-    import math
-
-    counts: Dict[str, int] = defaultdict(int)
-    for char in value:
-        counts[char] += 1
+# The sum of ``-p * log2(p)`` terms can exceed the exact ``log2`` bound by a
+# few ulps, so the bound checks leave this much room before rejecting.
+_ENTROPY_BOUND_SLACK = 1e-9
+
+
+@lru_cache(maxsize=8192)
+def _entropy_at_least(value: str, threshold: float) -> bool:
+    """Return whether the Shannon entropy of ``value`` reaches ``threshold``.
+
+    The entropy is ``H = -sum(p * log2(p))`` over the relative frequency
+    ``p = count / len(value)`` of each distinct character, accumulated in
+    first-occurrence order. ``H`` is at most ``log2`` of the number of
+    distinct characters, so values whose bound falls clearly short are
+    rejected before (or right after) counting, and because every term is
+    non-negative the sum stops as soon as it reaches the threshold.
+    Results are memoised because the same domains are queried over and over.
+    """
+
+    length = len(value)
+    log2 = math.log2
+    if not length:
+        return threshold <= 0.0
+    if log2(length) + _ENTROPY_BOUND_SLACK < threshold:
+        return False
+    counts = Counter(value)
+    if log2(len(counts)) + _ENTROPY_BOUND_SLACK < threshold:
+        return False
     entropy = 0.0
     for count in counts.values():
-        p = count / len(value)
-        entropy -= p * math.log2(p)
-    return entropy
+        p = count / length
+        entropy -= p * log2(p)
+        if entropy >= threshold:
+            return True
+    return False
@@ -4,62 +4,156 @@ from __future__ import annotations
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, Iterator, Optional
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+try:
+    import orjson  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    _json_loads = json.loads
+else:
+    def _json_loads(line: str):
+        try:
+            data = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            # orjson also rejects input the stdlib parser accepts (e.g. the
+            # NaN/Infinity tokens json.dumps emits); retry so such lines are
+            # still read and genuine errors come from ``json``.
+            return json.loads(line)
+        # orjson turns integers outside the 64-bit range into floats without
+        # an error. Such floats are at least 2**63 in magnitude, so reparse
+        # any line holding one with ``json`` to keep the exact digits. The
+        # cheap type scan keeps the common all-string/int lines on the fast path.
+        if type(data) is not dict or not _SCALAR_TYPES.issuperset(map(type, data.values())):
+            if _has_huge_float(data):
+                return json.loads(line)
+        return data
+
+    _SCALAR_TYPES = frozenset({str, int, bool, type(None)})
+
+    def _has_huge_float(value) -> bool:
+        kind = type(value)
+        if kind is float:
+            return abs(value) >= 2.0**63
+        if kind is dict:
+            return any(_has_huge_float(item) for item in value.values())
+        if kind is list:
+            return any(_has_huge_float(item) for item in value)
+        return False
 
 from .models import Event
 
 
+_METADATA_KEYS = frozenset({"timestamp", "category", "severity"})
+
+
 class LogIngestionError(RuntimeError):
     """Raised when logs cannot be parsed."""
 
 
-def read_log_files(paths: Iterable[Path], tzinfo=None) -> Iterator[Event]:
-    """Read newline-delimited JSON log files and yield :class:`Event` objects."""
+def read_log_files(
+    paths: Iterable[Path], tzinfo=None, fields: Optional[Iterable[str]] = None
+) -> Iterator[Event]:
+    """Read newline-delimited JSON log files and yield :class:`Event` objects.
+
+    Files are streamed line by line, so memory use does not grow with log size.
+    When ``fields`` is given, only those keys are copied into
+    :attr:`Event.details`; by default every non-metadata key is kept.
+    """
 
+    if fields is not None:
+        fields = tuple(key for key in fields if key not in _METADATA_KEYS)
     for path in paths:
-        if not path.exists():
-            raise LogIngestionError(f"Log file {path} does not exist")
-        for line in path.read_text().splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-            except json.JSONDecodeError as exc:
-                raise LogIngestionError(f"Invalid JSON in {path}: {exc}") from exc
-            event = _normalize_event(data, source=str(path), tzinfo=tzinfo)
-            if event:
-                yield event
-
-
-def _normalize_event(data: dict, source: str, tzinfo=None) -> Optional[Event]:
-    timestamp = _parse_timestamp(data.get("timestamp"), tzinfo=tzinfo)
+        yield from _read_log_file(path, tzinfo, fields)
+
+
+def _read_log_file(path: Path, tzinfo, fields: Optional[Sequence[str]]) -> Iterator[Event]:
+    if not path.exists():
+        raise LogIngestionError(f"Log file {path} does not exist")
+    source = str(path)
+    # A log source nearly always uses one timestamp format; keep the last
+    # one that matched at the front so later lines try it first.
+    formats = list(_TIMESTAMP_FORMATS)
+    # Bound to locals and called positionally: this loop runs once per line.
+    loads = _json_loads
+    normalize = _normalize_event
+    # Universal newlines split on "\n", "\r" and "\r\n"; ``splitlines`` then
+    # handles the remaining line boundaries Python recognises (e.g. "\x0b",
+    # "\u2028"), so any file that ``read_text().splitlines()`` could read
+    # is still accepted.
+    with path.open("r", encoding="utf-8", buffering=1 << 20) as handle:
+        for chunk in handle:
+            for line in chunk.splitlines():
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = loads(line)
+                except json.JSONDecodeError as exc:
+                    raise LogIngestionError(f"Invalid JSON in {path}: {exc}") from exc
+                event = normalize(data, source, tzinfo, formats, fields)
+                if event:
+                    yield event
+
+
+def _normalize_event(
+    data: dict,
+    source: str,
+    tzinfo=None,
+    formats: Optional[List[str]] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Optional[Event]:
+    timestamp = _parse_timestamp(data.get("timestamp"), tzinfo, formats)
     if not timestamp:
         return None
     category = data.get("category", "unknown")
     severity = data.get("severity", "info")
-    details = {
-        key: str(value)
-        for key, value in data.items()
-        if key not in {"timestamp", "category", "severity"}
-    }
-    return Event(
-        timestamp=timestamp,
-        source=source,
-        category=category,
-        severity=severity,
-        details=details,
-    )
-
-
-def _parse_timestamp(value, tzinfo=None) -> Optional[datetime]:
+    if fields is None:
+        details = {key: str(value) for key, value in data.items() if key not in _METADATA_KEYS}
+    else:
+        details = {key: str(data[key]) for key in fields if key in data}
+    try:
+        return Event.from_timestamp(timestamp, source, category, severity, details)
+    except (OverflowError, OSError, ValueError):
+        # Timestamps outside the platform's epoch range are dropped like
+        # unparseable ones.
+        return None
+
+
+_TIMESTAMP_FORMATS = ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S")
+
+
+def _parse_timestamp(value, tzinfo=None, formats: Optional[List[str]] = None) -> Optional[datetime]:
+    """Parse a log timestamp.
+
+    ``formats`` is an optional per-source list of ``strptime`` formats that is
+    reordered in place so the most recently matched format is tried first.
+    """
+
     if not value:
         return None
     if isinstance(value, (int, float)):
         return datetime.fromtimestamp(value, tz=tzinfo)
-    for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"):
+    text = str(value)
+    # Zero-padded values in either supported format are handled by the C
+    # ``fromisoformat`` parser; the shape check keeps it from accepting ISO
+    # variants (offsets, fractions, week dates) that the formats reject.
+    if len(text) == 19 and text[10] in "T " and text[4] == text[7] == "-" and text[13] == text[16] == ":":
+        try:
+            timestamp = datetime.fromisoformat(text)
+        except ValueError:
+            pass
+        else:
+            # Both parsers return naive datetimes, so the common tz-less case
+            # can skip the ``replace`` copy.
+            return timestamp if tzinfo is None else timestamp.replace(tzinfo=tzinfo)
+    if formats is None:
+        formats = list(_TIMESTAMP_FORMATS)
+    for index, fmt in enumerate(formats):
         try:
-            return datetime.strptime(str(value), fmt).replace(tzinfo=tzinfo)
+            timestamp = datetime.strptime(text, fmt)
         except ValueError:
             continue
+        if index:
+            formats.insert(0, formats.pop(index))
+        return timestamp if tzinfo is None else timestamp.replace(tzinfo=tzinfo)
     return None
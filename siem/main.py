@@ -15,6 +15,11 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--logs", nargs="+", type=Path, required=True, help="Paths to log files")
     parser.add_argument("--rules", nargs="+", type=Path, required=True, help="Paths to rule files")
     parser.add_argument("--alert-dir", type=Path, default=None, help="Directory to store alert JSON files")
+    parser.add_argument(
+        "--compact-events",
+        action="store_true",
+        help="Only keep event fields used by the loaded rules (alerts show fewer details)",
+    )
     return parser.parse_args()
 
 
@@ -22,22 +27,37 @@ def main() -> int:
     args = parse_args()
     try:
         rules = load_rules(args.rules)
+        engine = DetectionEngine(rules)
     except ConfigurationError as exc:
         print(f"Error loading rules: {exc}")
         return 1
 
-    engine = DetectionEngine(rules)
-    dispatcher = AlertDispatcher(args.alert_dir)
+    event_count = 0
+    alert_count = 0
 
+    def counted_events():
+        nonlocal event_count
+        fields = engine.required_fields if args.compact_events else None
+        for event in read_log_files(args.logs, fields=fields):
+            event_count += 1
+            yield event
+
+    def counted_alerts(alerts):
+        nonlocal alert_count
+        for alert in alerts:
+            alert_count += 1
+            yield alert
+
+    # Alerts are dispatched as they are produced so memory use stays flat
+    # regardless of how many events are processed.
     try:
-        events = list(read_log_files(args.logs))
+        with AlertDispatcher(args.alert_dir) as dispatcher:
+            dispatcher.dispatch(counted_alerts(engine.process(counted_events())))
     except LogIngestionError as exc:
         print(f"Error reading logs: {exc}")
         return 2
 
-    alerts = list(engine.process(events))
-    dispatcher.dispatch(alerts)
-    print(f"Processed {len(events)} events and generated {len(alerts)} alerts.")
+    print(f"Processed {event_count} events and generated {alert_count} alerts.")
     return 0
 
 
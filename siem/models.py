@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Dict, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     """Normalized event generated from raw log data."""
 
@@ -15,9 +15,38 @@ class Event:
     category: str
     severity: str
     details: Dict[str, str]
+    # Unix time of ``timestamp`` in whole seconds (for alert identifiers) and
+    # nanoseconds (for window arithmetic). Build events with
+    # :meth:`from_timestamp` so both stay in sync with ``timestamp``.
+    epoch: int
+    epoch_ns: int
 
+    @classmethod
+    def from_timestamp(
+        cls, timestamp: datetime, source: str, category: str, severity: str, details: Dict[str, str]
+    ) -> "Event":
+        """Create an event, deriving ``epoch`` and ``epoch_ns`` from ``timestamp``.
 
-@dataclass
+        Raises:
+            OverflowError, OSError, ValueError: If ``timestamp`` is outside the
+                range the platform can convert to Unix time.
+        """
+
+        seconds = timestamp.timestamp()
+        return cls(
+            timestamp=timestamp,
+            source=source,
+            category=category,
+            severity=severity,
+            details=details,
+            epoch=int(seconds),
+            # Datetimes carry microseconds; rounding at that resolution
+            # removes float error before scaling to nanoseconds.
+            epoch_ns=round(seconds * 1_000_000) * 1_000,
+        )
+
+
+@dataclass(slots=True)
 class Alert:
     """Alert generated by detection rules."""
 
@@ -30,7 +59,7 @@ class Alert:
     remediation: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DetectionRule:
     """Configuration for a detection rule."""
 
@@ -0,0 +1,112 @@
+"""Sliding-window aggregators used by the detection engine."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import islice
+from typing import Hashable, List
+
+from .models import Event
+
+
+class SlidingWindow:
+    """Events inside a sliding time window, aggregated as a count.
+
+    Events are kept in arrival order alongside an ``array`` of their
+    ``epoch_ns`` values. Expired events are located with a binary search and
+    removed with one slice deletion, so a burst of evictions costs a single
+    memmove rather than one operation per event, and every event is evicted
+    at most once.
+    """
+
+    __slots__ = ("events", "_timestamps", "_in_order")
+
+    def __init__(self) -> None:
+        self.events: List[Event] = []
+        self._timestamps = array("q")
+        self._in_order = True
+
+    def insert(self, event: Event) -> None:
+        timestamps = self._timestamps
+        epoch_ns = event.epoch_ns
+        if timestamps and epoch_ns < timestamps[-1]:
+            self._in_order = False
+        timestamps.append(epoch_ns)
+        self.events.append(event)
+
+    def evict_until(self, cutoff_ns: int) -> None:
+        """Drop events older than ``cutoff_ns``."""
+
+        expired = self._count_expired(cutoff_ns)
+        if expired:
+            self._drop(expired)
+
+    def query(self) -> int:
+        return len(self.events)
+
+    def clear(self) -> None:
+        self.events.clear()
+        del self._timestamps[:]
+        self._in_order = True
+
+    def _count_expired(self, cutoff_ns: int) -> int:
+        timestamps = self._timestamps
+        if self._in_order:
+            return bisect_left(timestamps, cutoff_ns)
+        # Out-of-order arrivals make the array unsearchable; expire the
+        # leading run of old events just as a FIFO queue would.
+        expired = 0
+        size = len(timestamps)
+        while expired < size and timestamps[expired] < cutoff_ns:
+            expired += 1
+        return expired
+
+    def _drop(self, count: int) -> None:
+        del self.events[:count]
+        del self._timestamps[:count]
+
+
+class DistinctSlidingWindow(SlidingWindow):
+    """Sliding window aggregated as the number of distinct ``field`` values.
+
+    A ``Counter`` of the values in the window is updated on every insertion
+    and eviction, so :meth:`query` never rescans the window.
+    """
+
+    __slots__ = ("field", "_values", "_counts", "_distinct")
+
+    def __init__(self, field: str) -> None:
+        super().__init__()
+        self.field = field
+        self._values: List[Hashable] = []
+        self._counts: Counter = Counter()
+        self._distinct = 0
+
+    def insert(self, event: Event) -> None:
+        super().insert(event)
+        value = event.details.get(self.field)
+        self._values.append(value)
+        counts = self._counts
+        if counts[value] == 0:
+            self._distinct += 1
+        counts[value] += 1
+
+    def query(self) -> int:
+        return self._distinct
+
+    def clear(self) -> None:
+        super().clear()
+        self._values.clear()
+        self._counts.clear()
+        self._distinct = 0
+
+    def _drop(self, count: int) -> None:
+        counts = self._counts
+        for value in islice(self._values, count):
+            counts[value] -= 1
+            if counts[value] == 0:
+                del counts[value]
+                self._distinct -= 1
+        del self._values[:count]
+        super()._drop(count)